@@ -1,9 +1,10 @@
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class ChartAsset:
     """
     Represents a single weather chart or image.
@@ -16,8 +17,9 @@ class ChartAsset:
     content_type: Optional[str] = None
     source: Optional[str] = None
     extras: Dict[str, Any] = field(default_factory=dict)
+    pending_future: Optional[Future] = field(default=None, repr=False, compare=False)  # file still being written
 
-@dataclass
+@dataclass(slots=True)
 class TextAsset:
     """
     Represents a generated text artifact (e.g. NOTAM digest, summary, report).
@@ -29,7 +31,7 @@ class TextAsset:
     source: Optional[str] = None
     extras: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class Briefing:
     generated_at_utc: datetime
     charts: List[ChartAsset] = field(default_factory=list)
@@ -37,3 +39,20 @@ class Briefing:
     notes: List[str] = field(default_factory=list)
     health: Dict[str, Any] = field(default_factory=dict)
 
+    def finalize(self) -> None:
+        """
+        Wait for charts still being written in the background. Charts whose
+        write failed are dropped and noted.
+        """
+        charts = []
+        for chart in self.charts:
+            fut, chart.pending_future = chart.pending_future, None
+            if fut is not None:
+                try:
+                    fut.result()
+                except Exception as e:
+                    self.notes.append(f"{chart.source}: saving {chart.local_path} failed: {e}")
+                    continue
+            charts.append(chart)
+        self.charts = charts
+
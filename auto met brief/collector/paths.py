@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Union
+
+
+def ensure_dir(path: Union[str, Path]) -> Path:
+    """
+    mkdir -p. Not cached: a long-running process must recreate directories
+    that were deleted or rotated since the last call, and it's one syscall.
+    """
+    p = Path(path)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+from webdriver_manager.firefox import GeckoDriverManager
+
+
+@lru_cache(maxsize=1)
+def geckodriver_path() -> str:
+    """
+    Resolve the geckodriver binary once per process. GeckoDriverManager does a
+    version check (HTTP + cache-dir walk) on every install() call.
+
+    Set GECKODRIVER_PATH to pin a known-good binary and skip webdriver-manager.
+    """
+    pinned = os.environ.get("GECKODRIVER_PATH")
+    if pinned:
+        return pinned
+    return GeckoDriverManager().install()
+
+
+# Applied to every session. The scrapers only read DOM text and attributes
+# (images are fetched separately), so skip everything that is just rendering.
+_DEFAULT_PREFS: Dict[str, Any] = {
+    # startup: no update, safe-browsing or crash-recovery work, one content process
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "browser.safebrowsing.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.sessionstore.resume_from_crash": False,
+    "toolkit.startup.max_resumed_crashes": -1,
+    "dom.ipc.processCount": 1,
+    # page load: no image decoding, web fonts, media or WebRTC
+    "permissions.default.image": 2,
+    "browser.display.use_document_fonts": 0,
+    "media.autoplay.default": 5,
+    "media.peerconnection.enabled": False,
+    # network: in-memory cache only, no speculative connections or prefetch
+    "browser.cache.disk.enable": False,
+    "browser.cache.memory.enable": True,
+    "network.prefetch-next": False,
+    "network.http.speculative-parallel-limit": 0,
+}
+
+
+@dataclass
+class SeleniumSession:
+    """
+    Owns a single Firefox instance that several Selenium providers can share
+    during one run. Firefox is launched lazily on first use of `driver`.
+
+        with SeleniumSession(headless=True) as browser:
+            MetWebRadarProvider().collect(..., browser=browser)
+            MetSelfBriefProvider(...).collect(..., browser=browser)
+    """
+    headless: bool = True
+    prefs: Dict[str, Any] = field(default_factory=dict)  # extra about:config overrides
+
+    _driver: Optional[webdriver.Remote] = field(default=None, init=False, repr=False)
+
+    # geckodriver process, kept across browser relaunches until close()
+    _service: Optional[Service] = field(default=None, init=False, repr=False)
+
+    def _service_url(self) -> str:
+        """
+        URL of a running geckodriver, only spawning a new one if ours is gone
+        or can't take a new session.
+        """
+        if self._service is not None:
+            # geckodriver serves one session at a time and reports ready=false
+            # while it still holds one, e.g. after a quit() that failed
+            try:
+                r = requests.get(self._service.service_url + "/status", timeout=0.2)
+                if r.ok and r.json()["value"]["ready"]:
+                    return self._service.service_url
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                pass
+            self._stop_service()
+
+        self._service = Service(geckodriver_path())
+        self._service.start()
+        return self._service.service_url
+
+    def _stop_service(self) -> None:
+        if self._service is not None:
+            try:
+                self._service.stop()
+            finally:
+                self._service = None
+
+    @property
+    def driver(self) -> webdriver.Remote:
+        if self._driver is None:
+            opts = Options()
+            if self.headless:
+                opts.add_argument("--headless")
+            opts.add_argument("--width=1280")
+            opts.add_argument("--height=800")
+            for key, value in {**_DEFAULT_PREFS, **self.prefs}.items():
+                opts.set_preference(key, value)
+
+            self._driver = webdriver.Remote(
+                command_executor=self._service_url(),
+                options=opts,
+            )
+        return self._driver
+
+    def live_driver(self) -> webdriver.Remote:
+        """
+        Like `driver`, but relaunches Firefox if a long-lived session has died.
+        """
+        if self._driver is not None:
+            try:
+                self._driver.current_url
+            except WebDriverException:
+                self.quit_browser()
+        return self.driver
+
+    def reset(self) -> None:
+        """
+        Wipe cookies and park on about:blank so the browser can be reused for
+        the next run without carrying state over.
+        """
+        if self._driver is None:
+            return
+        try:
+            self._driver.delete_all_cookies()
+            self._driver.get("about:blank")
+        except WebDriverException:
+            self.quit_browser()
+
+    def quit_browser(self) -> None:
+        """
+        Quit Firefox but keep geckodriver running for the next launch.
+        """
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except WebDriverException:
+                pass  # already gone
+            finally:
+                self._driver = None
+
+    def close(self) -> None:
+        """
+        Quit Firefox and stop geckodriver.
+        """
+        self.quit_browser()
+        self._stop_service()
+
+    def __enter__(self) -> SeleniumSession:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
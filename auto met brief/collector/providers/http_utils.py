@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+import requests
+
+from collector.paths import ensure_dir
+
+
+def stream_to_file(r: requests.Response, save_path: Path, chunk_size: int = 1 << 16) -> None:
+    """
+    Copy a response opened with stream=True straight to disk, so the image is
+    never held in memory as a whole.
+    """
+    # let urllib3 undo any Content-Encoding (gzip/deflate) while copying
+    r.raw.decode_content = True
+
+    # Content-Length is the on-the-wire size, so it's only the file size when
+    # the body isn't encoded
+    size = 0
+    if not r.headers.get("Content-Encoding"):
+        try:
+            size = int(r.headers.get("Content-Length", "0"))
+        except ValueError:
+            size = 0
+
+    # Write next to the target and rename on success, so a dropped connection
+    # never leaves a partial (or zero-padded) file at save_path.
+    tmp = save_path.with_name(save_path.name + ".part")
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        with os.fdopen(fd, "wb", buffering=chunk_size) as f:
+            if size > 0 and hasattr(os, "posix_fallocate"):
+                # reserve the whole file up front so it gets one extent
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    pass
+            shutil.copyfileobj(r.raw, f, length=chunk_size)
+            # drop preallocated zeros if the body was shorter than advertised
+            f.truncate()
+        os.replace(tmp, save_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def write_file(save_path: Path, data: bytes) -> None:
+    """
+    Write data to save_path via a .part file, so a failed or interrupted write
+    never leaves a partial file at save_path.
+    """
+    tmp = save_path.with_name(save_path.name + ".part")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, save_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class HttpCache:
+    """
+    Small JSON store of ETag / Last-Modified validators per URL, so repeat runs
+    can send conditional GETs and reuse the local file on 304 Not Modified.
+    Keeps at most max_entries, dropping the least recently updated first.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 256) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        try:
+            self._entries: Dict[str, Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for url, or None if there is none or its file is gone.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry and entry.get("local_path") and Path(entry["local_path"]).is_file():
+            return entry
+        return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url: str, r: requests.Response, local_path: Path, content_type: Optional[str] = None) -> None:
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        with self._lock:
+            # local_path now holds this URL's body, so no other entry may claim it
+            stale = [u for u, e in self._entries.items() if e.get("local_path") == str(local_path)]
+            for u in stale:
+                del self._entries[u]
+            self._entries.pop(url, None)  # re-insert so dict order tracks recency
+            if not etag and not last_modified:
+                return
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "local_path": str(local_path),
+                "content_type": content_type,
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            live = [
+                (u, e) for u, e in self._entries.items()
+                if e.get("local_path") and Path(e["local_path"]).is_file()
+            ]
+            self._entries = dict(live[-self.max_entries:])
+            data = json.dumps(self._entries, indent=2)
+            ensure_dir(self.path.parent)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+_caches: Dict[str, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(path: Path) -> HttpCache:
+    """
+    One HttpCache per file per process, so providers running on different
+    threads don't overwrite each other's entries.
+    """
+    key = str(Path(path).resolve())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = HttpCache(Path(path))
+        return _caches[key]
+
+
+# Markers of login pages that need a real browser (JS-computed tokens/captchas)
+_CHALLENGE_MARKERS = (b"g-recaptcha", b"h-captcha", b"cf-challenge", b"cf-turnstile")
+
+
+def has_login_form(html: str) -> bool:
+    return bool(lxml.html.fromstring(html).xpath("//form[.//input[@name='password']]"))
+
+
+def form_login(
+    sess: requests.Session,
+    login_url: str,
+    credentials: Dict[str, str],
+    timeout_s: float,
+) -> Optional[requests.Response]:
+    """
+    Submit a plain HTML login form without a browser: GET the page, keep every
+    hidden/prefilled input (CSRF tokens etc.), fill in credentials and POST to
+    the form's action. Returns the POST response, or None if the page has no
+    password form or looks like it needs JavaScript to log in.
+    """
+    page = sess.get(login_url, timeout=timeout_s)
+    page.raise_for_status()
+
+    if any(m in page.content.lower() for m in _CHALLENGE_MARKERS):
+        return None
+
+    forms = lxml.html.fromstring(page.content).xpath("//form[.//input[@name='password']]")
+    if not forms:
+        return None
+    form = forms[0]
+
+    data: Dict[str, str] = {}
+    for inp in form.xpath(".//input[@name]"):
+        if (inp.get("type") or "").lower() in ("submit", "button", "image", "checkbox", "radio"):
+            continue
+        data[inp.get("name")] = inp.get("value") or ""
+    data.update(credentials)
+
+    action = urljoin(page.url, form.get("action") or page.url)
+    if (form.get("method") or "get").lower() == "post":
+        r = sess.post(action, data=data, timeout=timeout_s)
+    else:
+        r = sess.get(action, params=data, timeout=timeout_s)
+    r.raise_for_status()
+    return r
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from typing import Dict, List, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from collector.models import Briefing, ChartAsset
+from collector.paths import ensure_dir
+from collector.providers.http_utils import get_http_cache, stream_to_file
+
+
+class _HeadRefused(Exception):
+    """HEAD gave no usable answer (405, 403, 501, ...); probe with GETs instead."""
 
 
 @dataclass
@@ -20,53 +30,184 @@ class InfraredProvider:
     step_minutes: int = 15
     max_steps: int = 32          # 32 * 15min = 8 hours back-search
     timeout_s: int = 15
+    max_workers: int = 8         # concurrent HEAD probes
+    http_cache_path: str = "out/.http_cache.json"  # ETag/Last-Modified store
+
+    _session: requests.Session = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Keep-alive session reused across collect() calls. Transient 5xx and
+        # connection errors are retried by urllib3 so they don't cost a slot;
+        # only a 404 means "not published yet, step back".
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET", "HEAD"],
+        )
+        self._session = requests.Session()
+        self._session.mount(
+            "https://",
+            HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=self.max_workers),
+        )
+
+    def _url_for(self, t: datetime) -> str:
+        return f"{self.base_url}/web17_sat_irl_ir_{t.strftime('%Y%m%d%H%M')}.jpeg"
+
+    def _head_probe(self, urls: Dict[int, str]) -> Dict[int, Union[int, Exception]]:
+        """
+        HEAD the given candidate URLs concurrently; maps index -> status or error.
+        """
+        results: Dict[int, Union[int, Exception]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            futures = {
+                ex.submit(self._session.head, url, timeout=self.timeout_s, allow_redirects=True): idx
+                for idx, url in urls.items()
+            }
+            for fut in as_completed(futures):
+                try:
+                    results[futures[fut]] = fut.result().status_code
+                except Exception as e:
+                    results[futures[fut]] = e
+        return results
+
+    def _head_scan(self, candidates: List[datetime]) -> tuple[Optional[datetime], Optional[Exception]]:
+        """
+        Find the newest published candidate (candidates are newest -> oldest).
+
+        Frames are published in order, so availability is monotone across the
+        list and we can narrow the window instead of probing every slot: each
+        round HEADs up to max_workers evenly spaced candidates in parallel and
+        keeps only the gap between the last miss and the first hit. 33 slots
+        resolve in two rounds.
+
+        Only a 404 counts as a miss. A slot answered with anything else (an
+        error after the urllib3 retries, 403, 405, 5xx...) is unknown, so it
+        is probed once more; if it is still unknown we can't narrow past it.
+
+        Returns the newest hit along with the last error seen on the way.
+        Raises _HeadRefused if a slot newer than the hit stays unknown, e.g.
+        the server refuses HEAD outright; the caller then walks with GETs.
+        """
+        lo, hi = 0, len(candidates)  # answer lies in [lo, hi); hi is the best hit so far
+        best: Optional[int] = None
+        last_error: Optional[Exception] = None
+
+        while lo < hi:
+            n = hi - lo
+            k = min(self.max_workers, n)
+            idxs = sorted({lo + (n * j) // k for j in range(k)})
+
+            results = self._head_probe({i: self._url_for(candidates[i]) for i in idxs})
+
+            first_hit: Optional[int] = None
+            for i in idxs:
+                res = results[i]
+                if res not in (200, 404):
+                    if isinstance(res, Exception):
+                        last_error = res
+                    res = self._head_probe({i: self._url_for(candidates[i])})[i]
+                if res == 200:
+                    first_hit = i
+                    break
+                if res != 404:
+                    # skipping this slot could skip the freshest frame
+                    raise _HeadRefused(f"HEAD {self._url_for(candidates[i])}: {res}")
+
+            if first_hit is None:
+                # everything probed is missing: the answer is past the last probe
+                lo = idxs[-1] + 1
+            else:
+                best = hi = first_hit
+                lo = max((i for i in idxs if i < first_hit), default=lo - 1) + 1
+
+        return (candidates[best] if best is not None else None), last_error
+
+    def _download(self, t: datetime, out_dir: Path, now_utc: datetime) -> ChartAsset:
+        ymd = t.strftime("%Y%m%d")
+        hm = t.strftime("%H%M")
+        url = self._url_for(t)
+
+        save_path = out_dir / f"ireland_ir_{ymd}_{hm}.jpeg"
+
+        # Adjacent runs usually land on the same latest frame; ask the server
+        # whether our copy is still current before pulling the bytes again.
+        cache = get_http_cache(Path(self.http_cache_path))
+        cached = cache.lookup(url)
+
+        with self._session.get(
+            url,
+            timeout=self.timeout_s,
+            allow_redirects=True,
+            stream=True,
+            headers=cache.conditional_headers(cached),
+        ) as r:
+            not_modified = r.status_code == 304 and cached is not None
+            if not_modified:
+                save_path = Path(cached["local_path"])
+            else:
+                r.raise_for_status()
+                stream_to_file(r, save_path)
+                cache.update(url, r, save_path, "image/jpeg")
+                cache.save()
+
+        return ChartAsset(
+            name=f"Ireland IR Satellite {hm}Z (Latest Found)",
+            kind="satellite",
+            original_url=url,
+            fetched_at_utc=now_utc,
+            local_path=str(save_path),
+            content_type="image/jpeg",
+            source=self.name,
+            extras={"candidate_time_utc": t.isoformat(), "not_modified": not_modified},
+        )
 
     def collect(self, briefing: Briefing, out_dir: Path) -> None:
-        out_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(out_dir)
         now_utc = datetime.now(timezone.utc)
 
         # round down to nearest 15 minutes
         minute = (now_utc.minute // self.step_minutes) * self.step_minutes
-        t = now_utc.replace(minute=minute, second=0, microsecond=0)
+        t0 = now_utc.replace(minute=minute, second=0, microsecond=0)
 
-        session = requests.Session()
+        # newest -> oldest
+        candidates = [
+            t0 - timedelta(minutes=k * self.step_minutes)
+            for k in range(self.max_steps + 1)
+        ]
 
         last_error = None
 
-        for _ in range(self.max_steps + 1):
-            ymd = t.strftime("%Y%m%d")
-            hm = t.strftime("%H%M")
-            url = f"{self.base_url}/web17_sat_irl_ir_{ymd}{hm}.jpeg"
-
-            asset = ChartAsset(
-                name=f"Ireland IR Satellite {hm}Z (Latest Found)",
-                kind="satellite",
-                original_url=url,
-                fetched_at_utc=now_utc,
-                source=self.name,
-                extras={"candidate_time_utc": t.isoformat()},
-            )
-
+        try:
+            found, last_error = self._head_scan(candidates)
+        except _HeadRefused:
+            # HEAD inconclusive: fall back to probing with GETs one by one
+            found = None
+            for t in candidates:
+                try:
+                    briefing.charts.append(self._download(t, out_dir, now_utc))
+                    return  # success: stop after first valid image
+                except requests.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 404:
+                        continue
+                    last_error = e
+                except Exception as e:
+                    last_error = e
+                # anything but a 404 already went through the retry policy;
+                # stepping back further would just skip frames that may exist
+                break
+
+        if found is not None:
             try:
-                r = session.get(url, timeout=self.timeout_s, allow_redirects=True)
-                if r.status_code == 404:
-                    t -= timedelta(minutes=self.step_minutes)
-                    continue
-
-                r.raise_for_status()
-
-                save_path = out_dir / f"ireland_ir_{ymd}_{hm}.jpeg"
-                save_path.write_bytes(r.content)
-
-                asset.local_path = str(save_path)
-                asset.content_type = "image/jpeg"
-
-                briefing.charts.append(asset)
-                return  # success: stop after first valid image
-
+                briefing.charts.append(self._download(found, out_dir, now_utc))
+                if last_error is not None and found != candidates[0]:
+                    briefing.notes.append(
+                        f"{self.name}: newest frame found is {found:%H%M}Z; newer slots hit errors "
+                        f"(last error: {last_error})"
+                    )
+                return
             except Exception as e:
                 last_error = e
-                t -= timedelta(minutes=self.step_minutes)
 
         briefing.notes.append(
             f"{self.name}: no IR image found in last {self.max_steps*self.step_minutes} minutes"
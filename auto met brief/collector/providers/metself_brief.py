@@ -1,22 +1,84 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Optional
 import random
 import time
 from urllib.parse import urljoin
 
+import lxml.html
 import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.firefox import GeckoDriverManager
 
 from collector.models import Briefing, ChartAsset, TextAsset
+from collector.paths import ensure_dir
+from collector.providers.browser import SeleniumSession
+from collector.providers.http_utils import form_login, has_login_form
+
+
+# The briefing page is only read for its text, so on top of the session
+# defaults also skip styling. Only applied when the provider launches its own Firefox.
+_TEXT_ONLY_PREFS: Dict[str, Any] = {
+    "permissions.default.stylesheet": 2,  # block CSS, textContent doesn't need layout
+}
+
+
+_METAR_SECTION_XPATH = "/html/body/div/div[4]"
+_TAF_SECTION_XPATH = "/html/body/div/div[6]"
+
+# Returns the non-empty td.briefingText contents of the sections at the two
+# XPaths passed in, as [[...], [...]].
+_SECTION_TEXTS_JS = """
+const read = (xp) => {
+    const section = document.evaluate(
+        xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    if (!section) return [];
+    return Array.from(section.querySelectorAll("td.briefingText"))
+        .map(e => (e.textContent || "").trim())
+        .filter(t => t);
+};
+return [read(arguments[0]), read(arguments[1])];
+"""
+
+
+def _section_texts(doc, section_xpath: str) -> list[str]:
+    """
+    Same as _SECTION_TEXTS_JS for one section, on an lxml document.
+    """
+    sections = doc.xpath(section_xpath)
+    if not sections:
+        return []
+    cells = sections[0].xpath(".//td[contains(concat(' ', normalize-space(@class), ' '), ' briefingText ')]")
+    return [t for t in (c.text_content().strip() for c in cells) if t]
+
+
+def _pick_briefing_text(texts: list[str], prefix: str, station: str) -> str | None:
+    station_u = station.upper().strip()
+    pref_u = prefix.upper()
+
+    # Prefer station match
+    for t in texts:
+        up = t.upper()
+        if up.startswith(pref_u) and station_u in up:
+            return t
+
+    # Fallback: Casement name (in case station shown as name)
+    for t in texts:
+        up = t.upper()
+        if up.startswith(pref_u) and "CASEMENT" in up:
+            return t
+
+    # Fallback: first METAR/TAF in that section
+    for t in texts:
+        if t.upper().startswith(pref_u):
+            return t
+
+    return None
 
 
 def _human_type(el, text: str, min_delay: float = 0.08, max_delay: float = 0.18) -> None:
@@ -31,15 +93,30 @@ class MetSelfBriefProvider:
     base_url: str = "https://briefing.met.ie/"
     briefing_url: str = ""  # set in constructor or call
     timeout_s: int = 35
-    headless: bool = False  # start non-headless for debugging
+    headless: bool = True  # set False to watch the browser while debugging
+    slow_type: bool = False  # per-keystroke typing, only if the site starts challenging us
+    debug: bool = False  # dump page source + screenshot at each step into out/debug
 
     # TEMP ONLY: hardcode during bring-up
     username: str = ""
     password: str = ""
 
+    # keep-alive HTTP session for the no-browser fast path, and whether that
+    # path works here at all (None until the first try)
+    _session: requests.Session = field(init=False, repr=False)
+    _fast_path_ok: Optional[bool] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._session = requests.Session()
+
+    def _type(self, el, text: str) -> None:
+        if self.slow_type:
+            _human_type(el, text)
+        else:
+            el.send_keys(text)
+
     def _debug_dump(self, driver, out_dir: Path, tag: str) -> None:
-        debug_dir = out_dir / "debug"
-        debug_dir.mkdir(parents=True, exist_ok=True)
+        debug_dir = ensure_dir(out_dir / "debug")
         (debug_dir / f"{tag}.html").write_text(driver.page_source, encoding="utf-8")
         driver.save_screenshot(str(debug_dir / f"{tag}.png"))
         try:
@@ -48,6 +125,103 @@ class MetSelfBriefProvider:
         except Exception:
             pass
 
+    def _write_report(
+        self,
+        briefing: Briefing,
+        text_dir: Path,
+        station: str,
+        now_utc: datetime,
+        metar: str | None,
+        taf: str | None,
+    ) -> None:
+        report = "\n".join([
+            "Met Éireann Custom Briefing",
+            f"Generated (UTC): {now_utc.strftime('%Y-%m-%d %H:%M')}",
+            f"Station: {station}",
+            "",
+            "METAR:",
+            metar or "(not found)",
+            "",
+            "TAF:",
+            taf or "(not found)",
+            "",
+        ])
+
+        txt_path = text_dir / f"metar_taf_{station.lower()}_{now_utc.strftime('%Y%m%d_%H%M%S')}.txt"
+        txt_path.write_text(report, encoding="utf-8")
+
+        briefing.texts.append(
+            TextAsset(
+                name=f"METAR/TAF {station}",
+                kind="metar_taf",
+                generated_at_utc=now_utc,
+                local_path=str(txt_path),
+                source=self.name,
+            )
+        )
+
+    def try_requests_login(self, sess: requests.Session) -> bool:
+        """
+        Log in with a plain form POST. True if the briefing site accepted it.
+        """
+        try:
+            r = form_login(
+                sess,
+                self.briefing_url,
+                {"username": self.username, "password": self.password},
+                self.timeout_s,
+            )
+        except requests.RequestException:
+            return False
+        if r is None or has_login_form(r.text):
+            return False
+        return "custombriefing.php" in r.url.lower() or "PHPSESSID" in sess.cookies
+
+    def _collect_via_requests(
+        self,
+        briefing: Briefing,
+        sess: requests.Session,
+        text_dir: Path,
+        station: str,
+        now_utc: datetime,
+    ) -> bool:
+        """
+        Read METAR/TAF from the served briefing HTML. False if the sections are
+        only filled in by JavaScript, so Selenium can take over.
+        """
+        try:
+            page = sess.get(self.briefing_url, timeout=self.timeout_s)
+            page.raise_for_status()
+        except requests.RequestException:
+            return False
+
+        doc = lxml.html.fromstring(page.content)
+        metar = _pick_briefing_text(_section_texts(doc, _METAR_SECTION_XPATH), "METAR", station)
+        taf = _pick_briefing_text(_section_texts(doc, _TAF_SECTION_XPATH), "TAF", station)
+        if not metar or not taf:
+            return False
+
+        self._write_report(briefing, text_dir, station, now_utc, metar, taf)
+        return True
+
+    def _extract_metar_taf_from_sections(self, driver, wait, station: str = "EIME") -> tuple[str | None, str | None]:
+        # Each poll reads both sections in a single script call instead of one
+        # WebDriver round-trip per cell.
+        def _ready(d):
+            metar_texts, taf_texts = d.execute_script(_SECTION_TEXTS_JS, _METAR_SECTION_XPATH, _TAF_SECTION_XPATH)
+            has_metar = any(t.upper().startswith("METAR") for t in metar_texts)
+            has_taf = any(t.upper().startswith("TAF") for t in taf_texts)
+            if has_metar and has_taf:
+                return metar_texts, taf_texts
+            return False
+
+        # Wait until the sections are populated
+        metar_texts, taf_texts = wait.until(_ready)
+
+        metar = _pick_briefing_text(metar_texts, "METAR", station)
+        taf = _pick_briefing_text(taf_texts, "TAF", station)
+        return metar, taf
+
     def _safe_get(self, driver, url: str, attempts: int = 3, base_sleep: float = 1.5) -> None:
         """
         Navigate with retries. Treat Firefox about:neterror pages as failures.
@@ -64,37 +238,49 @@ class MetSelfBriefProvider:
                 time.sleep(base_sleep * i)
         raise last_err
 
-    def collect(self, briefing: Briefing, out_dir: Path, station: str = "EIME") -> None:
-        out_dir.mkdir(parents=True, exist_ok=True)
+    def collect(
+        self,
+        briefing: Briefing,
+        out_dir: Path,
+        station: str = "EIME",
+        browser: Optional[SeleniumSession] = None,
+    ) -> None:
         now_utc = datetime.now(timezone.utc)
 
-        charts_dir = out_dir / "charts" / self.name
-        charts_dir.mkdir(parents=True, exist_ok=True)
-
-        text_dir = out_dir / "text"
-        text_dir.mkdir(parents=True, exist_ok=True)
-
-        debug_dir = out_dir / "debug"
-        debug_dir.mkdir(parents=True, exist_ok=True)
+        # subdirectories create out_dir on the way
+        charts_dir = ensure_dir(out_dir / "charts" / self.name)
+        text_dir = ensure_dir(out_dir / "text")
 
-        opts = Options()
-        if self.headless:
-            opts.add_argument("--headless")
+        # Fast path: no browser at all if the briefing site works with a plain session.
+        # Once it has failed, stop paying for (and re-posting) the login each run.
+        if self._fast_path_ok is not False:
+            sess = self._session
+            try:
+                self._fast_path_ok = (
+                    self.try_requests_login(sess)
+                    and self._collect_via_requests(briefing, sess, text_dir, station, now_utc)
+                )
+            except Exception as e:
+                self._fast_path_ok = False
+                briefing.notes.append(f"{self.name}: requests fast path failed, using browser: {e}")
+            if self._fast_path_ok:
+                return
 
-        driver = webdriver.Firefox(
-            service=Service(GeckoDriverManager().install()),
-            options=opts,
-        )
+        # Reuse the caller's Firefox if given, otherwise run our own for this call.
+        # Sessions already logged in skip the login form below.
+        owns_browser = browser is None
+        if owns_browser:
+            browser = SeleniumSession(headless=self.headless, prefs=_TEXT_ONLY_PREFS)
 
+        driver = None
         try:
+            driver = browser.driver
             wait = WebDriverWait(driver, self.timeout_s)
 
-            # 1) Go to briefing URL (should redirect to login if not authenticated)
-            driver.get(self.briefing_url)
-
-            # Navigate to briefing URL (will redirect to login if needed)
+            # 1) Navigate to briefing URL (will redirect to login if needed)
             self._safe_get(driver, self.briefing_url, attempts=3)
-            self._debug_dump(driver, out_dir, "01_after_get_briefing_url")
+            if self.debug:
+                self._debug_dump(driver, out_dir, "01_after_get_briefing_url")
             
             # If we see a login form, log in
             def on_login_page(d) -> bool:
@@ -107,17 +293,14 @@ class MetSelfBriefProvider:
                 pass_el = wait.until(lambda d: d.find_element(By.CSS_SELECTOR, "input[name='password'], input#password"))
             
                 user_el.clear()
-                _human_type(user_el, self.username)
-                time.sleep(random.uniform(0.3, 0.8))
+                self._type(user_el, self.username)
             
                 pass_el.clear()
-                _human_type(pass_el, self.password)
-                time.sleep(random.uniform(0.4, 1.0))
+                self._type(pass_el, self.password)
             
                 # Submit: try button[type=submit] first, then input[type=submit]
                 submit = wait.until(lambda d: d.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit']"))
                 driver.execute_script("arguments[0].scrollIntoView(true);", submit)
-                time.sleep(random.uniform(0.2, 0.5))
                 submit.click()
             
                 # Wait for login to complete: either we leave login page, or we see the briefing URL loaded
@@ -129,50 +312,25 @@ class MetSelfBriefProvider:
                     return ("custombriefing.php" in d.current_url.lower()) or ("briefing" in d.current_url.lower())
             
                 wait.until(login_complete)
-                self._debug_dump(driver, out_dir, "02_after_login_submit")
+                if self.debug:
+                    self._debug_dump(driver, out_dir, "02_after_login_submit")
             
-            # Now ensure we are on the briefing page
-            self._safe_get(driver, self.briefing_url, attempts=3)
-            self._debug_dump(driver, out_dir, "03_after_get_briefing_url_post_login")
+            # Now ensure we are on the briefing page. The login form normally
+            # redirects straight back, so only reload when it didn't.
+            if "custombriefing.php" not in driver.current_url.lower():
+                self._safe_get(driver, self.briefing_url, attempts=3)
+            if self.debug:
+                self._debug_dump(driver, out_dir, "03_after_get_briefing_url_post_login")
 
 
             # 5) Extract METAR and TAF for station from rendered body text
-            wait.until(lambda d: any(
-                (el.get_attribute("textContent") or "").strip().upper().startswith("METAR")
-                for el in d.find_elements(By.CSS_SELECTOR, "td.briefingText")
-            ))
-
-            metar_text, taf_text = self._extract_metar_taf_from_sections(
+            metar, taf = self._extract_metar_taf_from_sections(
                 driver=driver,
                 wait=wait,
                 station=station,   # "EIME"
             )
 
-            report = "\n".join([
-                "Met Éireann Custom Briefing",
-                f"Generated (UTC): {now_utc.strftime('%Y-%m-%d %H:%M')}",
-                f"Station: {station}",
-                "",
-                "METAR:",
-                metar or "(not found)",
-                "",
-                "TAF:",
-                taf or "(not found)",
-                "",
-            ])
-
-            txt_path = text_dir / f"metar_taf_{station.lower()}_{now_utc.strftime('%Y%m%d_%H%M%S')}.txt"
-            txt_path.write_text(report, encoding="utf-8")
-
-            briefing.texts.append(
-                TextAsset(
-                    name=f"METAR/TAF {station}",
-                    kind="metar_taf",
-                    generated_at_utc=now_utc,
-                    local_path=str(txt_path),
-                    source=self.name,
-                )
-            )
+            self._write_report(briefing, text_dir, station, now_utc, metar, taf)
 
             # 6) Download charts by finding <img> and links near the section headings
             # Placeholder: we’ll implement once we confirm the markup in debug HTML.
@@ -182,65 +340,14 @@ class MetSelfBriefProvider:
             briefing.notes.append(f"{self.name}: failed: {e}")
 
             # capture debug on error too
-            try:
-                (debug_dir / "error_page.html").write_text(driver.page_source, encoding="utf-8")
-                driver.save_screenshot(str(debug_dir / "error_page.png"))
-            except Exception:
-                pass
+            if self.debug and driver is not None:
+                try:
+                    debug_dir = ensure_dir(out_dir / "debug")
+                    (debug_dir / "error_page.html").write_text(driver.page_source, encoding="utf-8")
+                    driver.save_screenshot(str(debug_dir / "error_page.png"))
+                except Exception:
+                    pass
 
         finally:
-            driver.quit()
-
-
-def _extract_metar_taf_from_sections(self, driver, wait, station: str = "EIME") -> tuple[str | None, str | None]:
-    station_u = station.upper().strip()
-
-    metar_section_xpath = "/html/body/div/div[4]"
-    taf_section_xpath = "/html/body/div/div[6]"
-
-    def wait_section_has_text(section_xpath: str, must_start: str) -> None:
-        must_start_u = must_start.upper()
-        def _ready(d):
-            section = d.find_element(By.XPATH, section_xpath)
-            cells = section.find_elements(By.CSS_SELECTOR, "td.briefingText")
-            for c in cells:
-                txt = (c.get_attribute("textContent") or "").strip()
-                if txt and txt.upper().startswith(must_start_u):
-                    return True
-            return False
-        wait.until(_ready)
-
-    def pick_from_section(section_xpath: str, prefix: str) -> str | None:
-        section = driver.find_element(By.XPATH, section_xpath)
-        cells = section.find_elements(By.CSS_SELECTOR, "td.briefingText")
-        texts = [(c.get_attribute("textContent") or "").strip() for c in cells]
-        texts = [t for t in texts if t]
-
-        pref_u = prefix.upper()
-
-        # Prefer station match
-        for t in texts:
-            up = t.upper()
-            if up.startswith(pref_u) and station_u in up:
-                return t
-
-        # Fallback: Casement name (in case station shown as name)
-        for t in texts:
-            up = t.upper()
-            if up.startswith(pref_u) and "CASEMENT" in up:
-                return t
-
-        # Fallback: first METAR/TAF in that section
-        for t in texts:
-            if t.upper().startswith(pref_u):
-                return t
-
-        return None
-
-    # Wait until the sections are populated
-    wait_section_has_text(metar_section_xpath, "METAR")
-    wait_section_has_text(taf_section_xpath, "TAF")
-
-    metar = pick_from_section(metar_section_xpath, "METAR")
-    taf = pick_from_section(taf_section_xpath, "TAF")
-    return metar, taf
+            if owns_browser:
+                browser.close()
@@ -1,22 +1,82 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urljoin, urlparse
+import base64
 import random
+import re
 import time
 
+import lxml.html
 import requests
-from selenium import webdriver
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.firefox import GeckoDriverManager
 
 from collector.models import Briefing, ChartAsset
+from collector.paths import ensure_dir
+from collector.providers.browser import SeleniumSession
+from collector.providers.http_utils import form_login, get_http_cache, has_login_form, stream_to_file, write_file
+
+
+# Observations -> Radar -> (5min): IRE menu, and the radar image on that page.
+# They work but are brittle; if metweb changes markup, adjust them here.
+_OBS_XPATH = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/a"
+_RADAR_XPATH = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/ul/li[3]"
+_IRE_XPATH = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/ul/li[3]/ul/li[1]/a"
+_IMAGE_XPATH = "/html/body/div[2]/div[1]/div/div/div[2]/article/section/div[1]/img"
+
+# Selenium tries the CSS selector first (cheaper to dispatch than XPath and
+# not tied to the full page path), then falls back to the XPath above.
+_OBS = (
+    (By.CSS_SELECTOR, "header nav:nth-of-type(2) > ul > li:nth-child(2) > a"),
+    (By.XPATH, _OBS_XPATH),
+)
+_RADAR = (
+    (By.CSS_SELECTOR, "header nav:nth-of-type(2) > ul > li:nth-child(2) > ul > li:nth-child(3)"),
+    (By.XPATH, _RADAR_XPATH),
+)
+_IRE = (
+    (By.CSS_SELECTOR, 'header nav a[href*="radar/5min/ire"]'),
+    (By.XPATH, _IRE_XPATH),
+)
+_IMAGE = (
+    (By.CSS_SELECTOR, "article section > div:nth-of-type(1) > img"),
+    (By.XPATH, _IMAGE_XPATH),
+)
+
+# Login form and page chrome
+_USER = (By.NAME, "username")
+_PASS = (By.NAME, "password")
+_LOGIN = (By.CSS_SELECTOR, "button[type='submit']")
+_NAV = (By.CSS_SELECTOR, "nav")
+
+
+# Fetch a URL from inside the page (same cookies and connection as the
+# browser) and hand it back as a data: URL; "error:..." if it failed.
+_FETCH_JS = """
+const done = arguments[arguments.length - 1];
+fetch(arguments[0], {credentials: 'include'})
+  .then(r => r.ok ? r.blob() : Promise.reject(new Error('HTTP ' + r.status)))
+  .then(b => { const fr = new FileReader(); fr.onload = () => done(fr.result); fr.readAsDataURL(b); })
+  .catch(e => done('error:' + e.message));
+"""
+
+# URL often contains ..._YYYYMMDDHHMM_...png; the stamp is the last-but-one "_" part
+_TS_RE = re.compile(r"_(\d{12})_[^_]*$")
 
 
 def _human_type(element, text: str, min_delay: float = 0.08, max_delay: float = 0.18) -> None:
@@ -28,6 +88,83 @@ def _human_type(element, text: str, min_delay: float = 0.08, max_delay: float =
         time.sleep(random.uniform(min_delay, max_delay))
 
 
+def _browser_fetch(driver, url: str) -> str:
+    """
+    Download url with the browser's own session rather than a second HTTP
+    client. Returns the body as a data: URL.
+    """
+    result = driver.execute_async_script(_FETCH_JS, url)
+    if not isinstance(result, str) or not result.startswith("data:"):
+        raise RuntimeError(f"in-browser fetch of {url} failed: {result}")
+    return result
+
+
+def _write_data_url(data_url: str, save_path: Path) -> None:
+    write_file(save_path, base64.b64decode(data_url.partition(",")[2]))
+
+
+def _retry(
+    fn,
+    attempts: int = 2,
+    on=(StaleElementReferenceException, ElementClickInterceptedException),
+    backoff_s: float = 0.0,
+):
+    """
+    Call fn, retrying on the given soft errors; the wait before each retry
+    doubles from backoff_s. The last failure propagates.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except on:
+            if attempt == attempts:
+                raise
+            time.sleep(backoff_s * 2 ** (attempt - 1))
+
+
+def _first_match(locators, clickable: bool = False):
+    """
+    Wait condition: the first element found by any of locators, tried in order.
+    With clickable=True it must also be displayed and enabled.
+    """
+    def _cond(d):
+        for locator in locators:
+            try:
+                el = d.find_element(*locator)
+            except NoSuchElementException:
+                continue
+            if not clickable or (el.is_displayed() and el.is_enabled()):
+                return el
+        return False
+    return _cond
+
+
+def _fast_type(driver, element, text: str) -> None:
+    """
+    Set the field value in one script call and fire the input/change events
+    the page's handlers listen for, instead of synthesising every keystroke.
+    """
+    driver.execute_script(
+        "arguments[0].value = arguments[1];"
+        "arguments[0].dispatchEvent(new Event('input', {bubbles: true}));"
+        "arguments[0].dispatchEvent(new Event('change', {bubbles: true}));",
+        element,
+        text,
+    )
+
+
+def _js_click(driver, wait: WebDriverWait, locators, what: str, attempts: int = 3) -> None:
+    """
+    Wait for a clickable match, then scroll to and click it in one script
+    call. Re-finds the element if the menu re-renders underneath us.
+    """
+    def click() -> None:
+        el = wait.until(_first_match(locators, clickable=True), message=what)
+        driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", el)
+
+    _retry(click, attempts, on=(StaleElementReferenceException, JavascriptException))
+
+
 @dataclass
 class MetWebRadarProvider:
     """
@@ -38,136 +175,309 @@ class MetWebRadarProvider:
     home_url: str = "https://www.metweb.ie/home-page"
     timeout_s: int = 25
     headless: bool = True
+    user_agent: str = "Mozilla/5.0"
+    http_cache_path: str = "out/.http_cache.json"  # ETag/Last-Modified store
+    slow_type: bool = False  # per-keystroke typing, only if the site starts challenging us
 
     # Credentials (pass in via collect() or set defaults). Prefer env vars in production.
     username: Optional[str] = None
     password: Optional[str] = None
 
-    def collect(self, briefing: Briefing, out_dir: Path, username: str, password: str) -> None:
-        out_dir.mkdir(parents=True, exist_ok=True)
-        now_utc = datetime.now(timezone.utc)
+    # Firefox kept alive across collect() calls when no browser is passed in
+    _browser: Optional[SeleniumSession] = field(default=None, init=False, repr=False)
+
+    # keep-alive HTTP session for the no-browser fast path, and whether that
+    # path works here at all (None until the first try)
+    _session: requests.Session = field(init=False, repr=False)
+    _fast_path_ok: Optional[bool] = field(default=None, init=False, repr=False)
+
+    # decodes/writes images in the background; see Briefing.finalize()
+    _io_pool: ThreadPoolExecutor = field(init=False, repr=False)
+
+    # IRE radar page URL, learned from the menu on the first run
+    _ire_url: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = self.user_agent
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix=self.name)
+
+    def _get_driver(self, browser: Optional[SeleniumSession]):
+        if browser is None:
+            if self._browser is None:
+                self._browser = SeleniumSession(headless=self.headless)
+            browser = self._browser
+        driver = browser.live_driver()
+        # Bound driver.get() and the in-page fetch; by default both can hang forever
+        driver.set_page_load_timeout(self.timeout_s)
+        driver.set_script_timeout(self.timeout_s)
+        return driver
+
+    def _get(self, driver, url: str, attempts: int = 2) -> None:
+        """
+        Navigate to url. If the load times out, stop it and try again; after
+        the last attempt carry on with whatever has rendered and let the
+        element waits decide.
+        """
+        for _ in range(attempts):
+            try:
+                driver.get(url)
+                return
+            except TimeoutException:
+                driver.execute_script("window.stop();")
+
+    def close(self) -> None:
+        """
+        Finish pending image writes and quit the provider's own Firefox, if it
+        started one. The provider can't save images after this.
+        """
+        self._io_pool.shutdown(wait=True)
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+
+    def __del__(self) -> None:
+        if getattr(self, "_browser", None) is not None:
+            self.close()
+
+    def _type(self, driver, el, text: str) -> None:
+        if self.slow_type:
+            el.clear()
+            _human_type(el, text)
+        else:
+            _fast_type(driver, el, text)  # overwrites, no clear() needed
+
+    def try_requests_login(self, sess: requests.Session, username: str, password: str) -> bool:
+        """
+        Log in with a plain form POST. True if we ended up off the login page.
+        """
+        try:
+            r = form_login(sess, self.login_url, {"username": username, "password": password}, self.timeout_s)
+        except requests.RequestException:
+            return False
+        return r is not None and r.url.rstrip("/") != self.login_url.rstrip("/") and not has_login_form(r.text)
+
+    def _collect_via_requests(self, briefing: Briefing, sess: requests.Session, out_dir: Path, now_utc: datetime) -> bool:
+        """
+        Follow the IRE menu link and radar <img> straight from the served HTML.
+        False if the markup isn't there without JavaScript, so Selenium can take over.
+        """
+        try:
+            home = sess.get(self.home_url, timeout=self.timeout_s)
+            home.raise_for_status()
+            hrefs = lxml.html.fromstring(home.content).xpath(_IRE_XPATH + "/@href")
+            if not hrefs or hrefs[0].startswith(("#", "javascript:")):
+                return False
+
+            page = sess.get(urljoin(home.url, hrefs[0]), timeout=self.timeout_s)
+            page.raise_for_status()
+            self._ire_url = page.url
+            srcs = lxml.html.fromstring(page.content).xpath(_IMAGE_XPATH + "/@src")
+            if not srcs:
+                return False
+
+            self._save_radar(briefing, urljoin(page.url, srcs[0]), out_dir, now_utc, sess=sess)
+            return True
+        except requests.RequestException:
+            return False
+
+    def _save_radar(
+        self,
+        briefing: Briefing,
+        img_src: str,
+        out_dir: Path,
+        now_utc: datetime,
+        sess: Optional[requests.Session] = None,
+        driver=None,
+    ) -> None:
+        """
+        Save the radar frame via the logged-in browser if driver is given,
+        otherwise via sess.
+        """
+        # Resolve root-relative, relative and protocol-relative srcs alike
+        img_url = urljoin(self.home_url, img_src)
+
+        # Save file and emit ChartAsset
+        # Attempt to parse timestamp from URL; fallback to now_utc
+        m = _TS_RE.search(img_url)
+        ts_hint = m.group(1) if m else None  # e.g. 202504021705
+
+        filename = f"radar_5min_ire_{ts_hint}.png" if ts_hint else "radar_5min_ire.png"
+
+        save_path = out_dir / filename
+
+        # A new frame only appears every 5 minutes. A stamped frame already on
+        # disk is final, so skip the download; over requests an unstamped URL
+        # gets a conditional GET.
+        not_modified = bool(ts_hint) and save_path.is_file() and save_path.stat().st_size > 0
+        pending: Optional[Future] = None
+        if not not_modified and driver is not None:
+            # Only the fetch needs the driver; the write overlaps with the
+            # browser reset and whatever else the caller does next.
+            data_url = _retry(
+                lambda: _browser_fetch(driver, img_url),
+                on=(RuntimeError, TimeoutException),
+                backoff_s=0.5,
+            )
+            pending = self._io_pool.submit(_write_data_url, data_url, save_path)
+        elif not not_modified:
+            cache = get_http_cache(Path(self.http_cache_path))
+            cached = None if ts_hint else cache.lookup(img_url)
+
+            with sess.get(img_url, timeout=20, stream=True, headers=cache.conditional_headers(cached)) as r:
+                if r.status_code == 304 and cached is not None:
+                    not_modified = True
+                    save_path = Path(cached["local_path"])
+                else:
+                    r.raise_for_status()
+                    stream_to_file(r, save_path)
+                    if not ts_hint:
+                        cache.update(img_url, r, save_path, "image/png")
+                        cache.save()
+
+        briefing.charts.append(
+            ChartAsset(
+                name="MetWeb Radar 5-min IRE (Latest)",
+                kind="radar",
+                original_url=img_url,
+                fetched_at_utc=now_utc,
+                local_path=str(save_path),
+                content_type="image/png",
+                source=self.name,
+                extras={"url_src": img_src, "timestamp_hint": ts_hint, "not_modified": not_modified},
+                pending_future=pending,
+            )
+        )
 
-        opts = Options()
-        opts.headless = self.headless
-        if self.headless:
-            opts.add_argument("--headless")
+    def collect(
+        self,
+        briefing: Briefing,
+        out_dir: Path,
+        username: str,
+        password: str,
+        browser: Optional[SeleniumSession] = None,
+    ) -> None:
+        ensure_dir(out_dir)
+        now_utc = datetime.now(timezone.utc)
 
-        driver = webdriver.Firefox(
-            service=Service(GeckoDriverManager().install()),
-            options=opts,
-        )
+        # Fast path: no browser at all if the site works with a plain session.
+        # Once it has failed, stop paying for (and re-posting) the login each run.
+        if self._fast_path_ok is not False:
+            sess = self._session
+            try:
+                self._fast_path_ok = (
+                    self.try_requests_login(sess, username, password)
+                    and self._collect_via_requests(briefing, sess, out_dir, now_utc)
+                )
+            except Exception as e:
+                self._fast_path_ok = False
+                briefing.notes.append(f"{self.name}: requests fast path failed, using browser: {e}")
+            if self._fast_path_ok:
+                return
 
         try:
-            wait = WebDriverWait(driver, self.timeout_s)
+            # Use the caller's Firefox if given, otherwise our own long-lived one
+            driver = self._get_driver(browser)
+
+            # Menu items and form fields show up quickly, so poll them often;
+            # the radar image loads slowly and doesn't need it.
+            fast = WebDriverWait(
+                driver,
+                self.timeout_s,
+                poll_frequency=0.1,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+            )
+            slow = WebDriverWait(driver, self.timeout_s, poll_frequency=0.5)
 
             # 1) Open login page
-            driver.get(self.login_url)
+            self._get(driver, self.login_url)
 
-            # 2) Wait for fields, then type slowly
-            user_el = wait.until(EC.presence_of_element_located((By.NAME, "username")))
-            pass_el = wait.until(EC.presence_of_element_located((By.NAME, "password")))
+            # 2) Wait for fields, then fill them in
+            user_el = fast.until(EC.presence_of_element_located(_USER), message="login username field")
+            pass_el = fast.until(EC.presence_of_element_located(_PASS), message="login password field")
 
-            user_el.clear()
-            _human_type(user_el, username)
+            self._type(driver, user_el, username)
+            self._type(driver, pass_el, password)
 
-            # brief pause between fields
-            time.sleep(random.uniform(0.3, 0.8))
+            # 3) Submit
+            _retry(lambda: fast.until(EC.element_to_be_clickable(_LOGIN), message="login button").click())
+
+            # Let the login POST finish before navigating anywhere else
+            login_path = urlparse(self.login_url).path.rstrip("/")
+            fast.until(
+                lambda d: urlparse(d.current_url).path.rstrip("/") != login_path,
+                message="redirect away from the login page",
+            )
 
-            pass_el.clear()
-            _human_type(pass_el, password)
+            img_el = None
+
+            # 4) Once we know where the IRE page lives, go straight there
+            if self._ire_url:
+                self._get(driver, self._ire_url)
+                try:
+                    img_el = slow.until(_first_match(_IMAGE), message="radar image on cached IRE page")
+                except TimeoutException:
+                    self._ire_url = None  # moved; learn it again through the menu
+
+            if img_el is None:
+                # Login normally redirects to the home page already
+                if urlparse(driver.current_url).path.rstrip("/") != urlparse(self.home_url).path.rstrip("/"):
+                    self._get(driver, self.home_url)
+                nav_el = fast.until(EC.presence_of_element_located(_NAV), message="home page nav")
+                menu_url = driver.current_url
+
+                # 5) Navigate to Observations -> Radar -> (5min): IRE
+                # Each click waits only until the next menu item is clickable.
+                _js_click(driver, fast, _OBS, "Observations menu")
+                _js_click(driver, fast, _RADAR, "Radar menu")
+                _js_click(driver, fast, _IRE, "IRE 5-min link")
+
+                # The IRE click returns before navigation starts, and the generic
+                # image selector also matches on the home page: wait to leave it.
+                slow.until(
+                    lambda d: d.current_url != menu_url or EC.staleness_of(nav_el)(d),
+                    message="IRE page to replace the home page",
+                )
 
-            # pause before clicking login
-            time.sleep(random.uniform(0.4, 1.0))
+                # 6) Wait for the radar image. A slow image gets one reload,
+                # but only if reloading the current URL won't land on home.
+                try:
+                    img_el = slow.until(_first_match(_IMAGE), message="radar image")
+                except TimeoutException:
+                    if driver.current_url == menu_url:
+                        raise
+                    self._get(driver, driver.current_url)
+                    img_el = slow.until(_first_match(_IMAGE), message="radar image after reload")
 
-            # 3) Submit
-            login_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
-            login_btn.click()
-
-            # 4) Confirm login by navigating to home page and waiting for nav
-            driver.get(self.home_url)
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "nav")))
-
-            # 5) Navigate to Observations -> Radar -> (5min): IRE
-            #
-            # Your earlier script used XPaths; they work but are brittle.
-            # If metweb changes markup, you may need to adjust selectors.
-            #
-            obs_xpath = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/a"
-            radar_xpath = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/ul/li[3]"
-            ire_xpath = "/html/body/div[2]/header/div/nav[2]/ul/li[2]/ul/li[3]/ul/li[1]/a"
-
-            obs = wait.until(EC.element_to_be_clickable((By.XPATH, obs_xpath)))
-            driver.execute_script("arguments[0].scrollIntoView(true);", obs)
-            time.sleep(random.uniform(0.2, 0.6))
-            driver.execute_script("arguments[0].click();", obs)
-
-            radar = wait.until(EC.element_to_be_clickable((By.XPATH, radar_xpath)))
-            driver.execute_script("arguments[0].scrollIntoView(true);", radar)
-            time.sleep(random.uniform(0.2, 0.6))
-            driver.execute_script("arguments[0].click();", radar)
-
-            ire = wait.until(EC.element_to_be_clickable((By.XPATH, ire_xpath)))
-            driver.execute_script("arguments[0].scrollIntoView(true);", ire)
-            time.sleep(random.uniform(0.2, 0.6))
-            driver.execute_script("arguments[0].click();", ire)
-
-            # 6) Wait for the radar image
-            # From your previous code: image element XPath below.
-            image_xpath = "/html/body/div[2]/div[1]/div/div/div[2]/article/section/div[1]/img"
-            img_el = wait.until(EC.presence_of_element_located((By.XPATH, image_xpath)))
+                # only worth remembering if the menu actually changed the URL
+                if driver.current_url.rstrip("/") != self.home_url.rstrip("/"):
+                    self._ire_url = driver.current_url
 
             img_src = img_el.get_attribute("src")
             if not img_src:
                 briefing.notes.append(f"{self.name}: radar img src not found")
                 return
 
-            # Normalize absolute URL
-            if img_src.startswith("/"):
-                img_url = "https://www.metweb.ie" + img_src
-            else:
-                img_url = img_src
-
-            # 7) Download using requests session with Selenium cookies
-            sess = requests.Session()
-            for c in driver.get_cookies():
-                sess.cookies.set(c["name"], c["value"])
+            # 7) Download inside the browser, which already holds the login
+            # and an open connection to metweb
+            self._save_radar(briefing, img_src, out_dir, now_utc, driver=driver)
 
-            r = sess.get(img_url, timeout=20)
-            r.raise_for_status()
+        except TimeoutException as e:
+            # page or element too slow this run; the browser itself is fine
+            briefing.notes.append(f"{self.name}: timed out waiting for {e.msg or 'page'}")
 
-            # 8) Save file and emit ChartAsset
-            # Attempt to parse timestamp from URL; fallback to now_utc
-            # URL often contains ..._YYYYMMDDHHMM_...png
-            ts_hint = None
-            try:
-                parts = img_url.split("_")
-                if len(parts) >= 2:
-                    ts_hint = parts[-2]  # e.g. 202504021705
-            except Exception:
-                pass
-
-            filename = "radar_5min_ire.png"
-            if ts_hint and ts_hint.isdigit() and len(ts_hint) == 12:
-                filename = f"radar_5min_ire_{ts_hint}.png"
-
-            save_path = out_dir / filename
-            save_path.write_bytes(r.content)
-
-            briefing.charts.append(
-                ChartAsset(
-                    name="MetWeb Radar 5-min IRE (Latest)",
-                    kind="radar",
-                    original_url=img_url,
-                    fetched_at_utc=now_utc,
-                    local_path=str(save_path),
-                    content_type="image/png",
-                    source=self.name,
-                    extras={"url_src": img_src, "timestamp_hint": ts_hint},
-                )
-            )
+        except WebDriverException as e:
+            briefing.notes.append(f"{self.name}: browser error: {e.msg}")
+            # the session may be wedged; relaunch our own Firefox next run,
+            # reusing the geckodriver that is already up
+            if browser is None and self._browser is not None:
+                self._browser.quit_browser()
 
         except Exception as e:
             briefing.notes.append(f"{self.name}: failed: {e}")
 
         finally:
-            driver.quit()
+            # keep our Firefox warm for the next run, just without its login
+            if browser is None and self._browser is not None:
+                self._browser.reset()
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urljoin
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 from collector.models import Briefing, ChartAsset
+from collector.paths import ensure_dir
+from collector.providers.http_utils import HttpCache, get_http_cache, stream_to_file
+
+
+_CT_EXT = {
+    "image/gif": ".gif",
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
 
 
 @dataclass
@@ -18,71 +30,118 @@ class SurfacePressureProvider:
     timeout_s: int = 20
     user_agent: str = "Mozilla/5.0"
     max_charts: int = 8  # chartColour0..chartColour7
+    http_cache_path: str = "out/.http_cache.json"  # ETag/Last-Modified store
+
+    _session: requests.Session = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # One pooled keep-alive session for the page and every chart image,
+        # kept across collect() calls so repeat runs skip the TLS handshake too.
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = self.user_agent
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.max_charts))
+
+    def _download(
+        self, cache: HttpCache, i: int, img_url: str, out_dir: Path
+    ) -> tuple[str, str]:
+        cached = cache.lookup(img_url)
+        # Files are named by chart index, so the cached copy is only ours if it
+        # sits in this chart's slot; otherwise ask for the full body.
+        if cached is not None and Path(cached["local_path"]).with_suffix("") != out_dir / f"spc_{i}":
+            cached = None
+
+        with self._session.get(
+            img_url,
+            timeout=self.timeout_s,
+            stream=True,
+            headers=cache.conditional_headers(cached),
+        ) as r:
+            if r.status_code == 304 and cached is not None:
+                # unchanged since the last run: keep the file we already have
+                return cached["local_path"], cached.get("content_type") or "image/gif"
+
+            r.raise_for_status()
+
+            content_type = (r.headers.get("Content-Type", "").split(";", 1)[0].strip().lower() or "image/gif")
+            ext = _CT_EXT.get(content_type, ".gif")
+
+            save_path = out_dir / f"spc_{i}{ext}"
+            stream_to_file(r, save_path)
+            cache.update(img_url, r, save_path, content_type)
+
+        return str(save_path), content_type
 
     def collect(self, briefing: Briefing, out_dir: Path) -> None:
-        out_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(out_dir)
 
-        headers = {"User-Agent": self.user_agent}
         now_utc = datetime.now(timezone.utc)
 
         try:
-            page = requests.get(self.page_url, headers=headers, timeout=self.timeout_s)
+            page = self._session.get(self.page_url, timeout=self.timeout_s)
             page.raise_for_status()
-            soup = BeautifulSoup(page.text, "html.parser")
+            doc = lxml.html.fromstring(page.content)
         except Exception as e:
             briefing.notes.append(f"{self.name}: failed to fetch page: {e}")
             return
 
-        downloaded = 0
+        pairs: list[tuple[int, str]] = []
+        seen: set[int] = set()
 
-        for i in range(self.max_charts):
-            li = soup.find("li", id=f"chartColour{i}")
-            if not li:
+        # one pass over the tree for every chartColourN item
+        for li in doc.xpath("//li[starts-with(@id, 'chartColour')]"):
+            suffix = li.get("id")[len("chartColour"):]
+            if not suffix.isdigit():
                 continue
 
-            img = li.find("img")
-            if not img:
+            i = int(suffix)
+            if i >= self.max_charts or i in seen:
                 continue
+            seen.add(i)
 
-            src = img.get("src") or img.get("data-src")
+            imgs = li.xpath(".//img")
+            if not imgs:
+                continue
+
+            src = imgs[0].get("src") or imgs[0].get("data-src")
             if not src:
                 continue
 
-            img_url = urljoin(self.page_url, src)
-
-            asset = ChartAsset(
-                name=f"Surface Pressure Chart {i}",
-                kind="analysis",
-                original_url=img_url,
-                fetched_at_utc=now_utc,
-                source=self.name,
-                extras={"chart_index": i},
-            )
-
-            try:
-                r = requests.get(img_url, headers=headers, timeout=self.timeout_s)
-                r.raise_for_status()
-
-                content_type = (r.headers.get("Content-Type", "").split(";")[0].strip() or "image/gif")
-                ext = ".gif"
-                if content_type == "image/jpeg":
-                    ext = ".jpg"
-                elif content_type == "image/png":
-                    ext = ".png"
-                elif content_type == "image/webp":
-                    ext = ".webp"
-
-                save_path = out_dir / f"spc_{i}{ext}"
-                save_path.write_bytes(r.content)
-
-                asset.local_path = str(save_path)
-                asset.content_type = content_type
-                downloaded += 1
-
-            except Exception as e:
-                briefing.notes.append(f"{self.name}: failed chart {i}: {e}")
-
-            briefing.charts.append(asset)
+            pairs.append((i, urljoin(self.page_url, src)))
+
+        assets: dict[int, ChartAsset] = {}
+        downloaded = 0
+        cache = get_http_cache(Path(self.http_cache_path))
+
+        if pairs:
+            with ThreadPoolExecutor(max_workers=len(pairs)) as ex:
+                futures = {
+                    ex.submit(self._download, cache, i, img_url, out_dir): (i, img_url)
+                    for i, img_url in pairs
+                }
+                for fut in as_completed(futures):
+                    i, img_url = futures[fut]
+
+                    asset = ChartAsset(
+                        name=f"Surface Pressure Chart {i}",
+                        kind="analysis",
+                        original_url=img_url,
+                        fetched_at_utc=now_utc,
+                        source=self.name,
+                        extras={"chart_index": i},
+                    )
+
+                    try:
+                        asset.local_path, asset.content_type = fut.result()
+                        downloaded += 1
+                    except Exception as e:
+                        briefing.notes.append(f"{self.name}: failed chart {i}: {e}")
+
+                    assets[i] = asset
+
+            cache.save()
+
+        # keep chart order stable regardless of completion order
+        briefing.charts.extend(assets[i] for i in sorted(assets))
 
         if downloaded == 0:
             briefing.notes.append(f"{self.name}: no charts downloaded (page structure may have changed)")
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -5,43 +6,91 @@ from collector.models import Briefing
 from collector.providers.infared import InfraredProvider
 from collector.providers.surface_pressure_provider import SurfacePressureProvider
 from collector.providers.metweb_radar_provider import MetWebRadarProvider
-from collector.providers.metie_briefing_provider import MetIeBriefingProvider
+from collector.providers.metself_brief import MetSelfBriefProvider
+from collector.providers.browser import SeleniumSession
 
 
 
 
 
-def main():
-    briefing = Briefing(
-        generated_at_utc=datetime.now(timezone.utc)
-    )
+def _run_provider(collect, generated_at_utc, **kwargs) -> Briefing:
+    """
+    Run a single provider against its own Briefing so providers can execute
+    concurrently without sharing mutable lists.
+    """
+    partial = Briefing(generated_at_utc=generated_at_utc)
+    collect(briefing=partial, **kwargs)
+    return partial
 
-    provider = InfraredProvider()
-    provider.collect(
-        briefing=briefing,
-        out_dir=Path("out/charts/satellite"),
-    )
-    
-    SurfacePressureProvider().collect(
-        briefing=briefing,
-        out_dir=Path("out/charts/surface_pressure"),
-    )
-    
+
+def _collect_with_browser(briefing: Briefing, browser: SeleniumSession) -> None:
+    """
+    The Selenium providers share one Firefox, and a driver must only be used
+    from one thread, so they run back to back inside a single job.
+    """
     MetWebRadarProvider(headless=True).collect(
         briefing=briefing,
         out_dir=Path("out/charts/radar_ire_5min"),
         username="FTSOPS",
         password="FTSWX",
-       
+        browser=browser,
     )
-    
-    MetIeBriefingProvider(headless=True).collect(
+    MetSelfBriefProvider(
+        briefing_url="https://briefing.met.ie/custombriefing.php?id=35b36b9cc7030b98e7db8ce45edf2b5a",
+        username="nathanmartin",
+        password="Label.Curious.Scared.Five",
+    ).collect(
         briefing=briefing,
         out_dir=Path("out"),
         station="EIME",
+        browser=browser,
     )
 
-    
+
+def main():
+    briefing = Briefing(
+        generated_at_utc=datetime.now(timezone.utc)
+    )
+
+    # Shared Firefox for the Selenium providers, see _collect_with_browser()
+    browser = SeleniumSession(headless=True)
+
+    # Each provider is network-bound, so run them side by side. Jobs never
+    # share a driver, so no Selenium state crosses threads.
+    infrared = InfraredProvider()
+    surface = SurfacePressureProvider()
+    jobs = [
+        (infrared.name, infrared.collect, dict(
+            out_dir=Path("out/charts/satellite"),
+        )),
+        (surface.name, surface.collect, dict(
+            out_dir=Path("out/charts/surface_pressure"),
+        )),
+        ("selenium", _collect_with_browser, dict(
+            browser=browser,
+        )),
+    ]
+
+    with browser, ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = {
+            ex.submit(_run_provider, collect, briefing.generated_at_utc, **kwargs): label
+            for label, collect, kwargs in jobs
+        }
+        for fut in as_completed(futures):
+            # one provider blowing up must not throw away the others' results
+            try:
+                partial = fut.result()
+            except Exception as e:
+                briefing.notes.append(f"{futures[fut]}: crashed: {e}")
+                continue
+            briefing.charts.extend(partial.charts)
+            briefing.texts.extend(partial.texts)
+            briefing.notes.extend(partial.notes)
+            briefing.health.update(partial.health)
+
+    # every file on disk before anything reads local_path
+    briefing.finalize()
+
     print("=== BRIEFING SUMMARY ===")
     print(f"Generated at: {briefing.generated_at_utc}")
     print(f"Charts collected: {len(briefing.charts)}")
@@ -1,9 +1,6 @@
-import sys
 from pathlib import Path
 from datetime import datetime, timezone
 
-sys.path.insert(0, str(Path(__file__).resolve().parent))
-
 from collector.models import Briefing
 from collector.providers.metself_brief import MetSelfBriefProvider
 
@@ -15,7 +12,6 @@ def main():
     briefing_url="https://briefing.met.ie/custombriefing.php?id=35b36b9cc7030b98e7db8ce45edf2b5a",
     username="nathanmartin",
     password="Label.Curious.Scared.Five",
-    headless=False,
     )
 
     p.collect(b, out_dir=Path("out"), station="EIME")